@@ -2,10 +2,31 @@ from openai import OpenAI
 from pathlib import Path
 
 import logging
+import subprocess
+import numpy as np
 import torch
 import stable_whisper
 from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
 
+WHISPER_SAMPLING_RATE = 16000
+
+def load_audio_pcm(media_path, sampling_rate = WHISPER_SAMPLING_RATE):
+    """
+    Decode the audio track of media_path with ffmpeg straight into memory as mono float32 PCM,
+    the input local whisper models expect, without writing an intermediate audio file.
+    """
+    cmd = ['ffmpeg', '-nostdin', '-i', str(media_path), '-vn',
+           '-f', 's16le', '-ac', '1', '-ar', str(sampling_rate), 'pipe:1']
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    pcm = proc.stdout.read()
+    if proc.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed to decode audio from {media_path}")
+    return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+def _local_audio_input(audio_path):
+    # local models accept either a file path or decoded 16kHz PCM
+    return audio_path if isinstance(audio_path, np.ndarray) else str(audio_path)
+
 def get_transcript(method, src_srt_path, source_lang, audio_path, client, task_logger, pre_load_asr_model = None):
 
     is_trans = False # is trans flag 
@@ -47,7 +68,7 @@ def get_transcript_stable(audio_path, whisper_model, init_prompt, pre_load_asr_m
         model = pre_load_asr_model
     else:
         model = stable_whisper.load_model(whisper_model, device)
-    transcript = model.transcribe(str(audio_path), regroup=False, initial_prompt=init_prompt)
+    transcript = model.transcribe(_local_audio_input(audio_path), regroup=False, initial_prompt=init_prompt)
     (
         transcript
         .split_by_punctuation(['.', '。', '?'])
@@ -88,7 +109,7 @@ def get_transcript_whisper_large_v3(audio_path, pre_load_asr_model = None):
     device=device,
     )
 
-    transcript_whisper_v3 = pipe(str(audio_path))
+    transcript_whisper_v3 = pipe(_local_audio_input(audio_path))
 
     # convert format
     transcript = []
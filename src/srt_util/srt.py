@@ -1,14 +1,28 @@
+import io
 import os
 import re
+from itertools import chain
 from pathlib import Path
-from copy import copy, deepcopy
-from csv import reader
-from datetime import timedelta
+import csv
+import functools
 import logging
+import math
 import openai
+from rapidfuzz import process, distance as rf_distance
+from tenacity import retry, stop_after_attempt, wait_exponential
 from tqdm import tqdm
 from .. import dict_util
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import enchant
+except ImportError:  # pyenchant needs the enchant C library
+    enchant = None
 
 # punctuation dictionary for supported languages
 punctuation_dict = {
@@ -59,9 +73,67 @@ punctuation_dict = {
     }
 }
 
+# precompiled per-language tables, built once at import
+_PUNC_TRANSLATE = {lang: str.maketrans({c: ' ' for c in d["punc_str"] if not c.isspace()})
+                   for lang, d in punctuation_dict.items()}
+_SENTENCE_END_SET = {lang: frozenset(d["sentence_end"]) for lang, d in punctuation_dict.items()}
+
 dict_path = "./domain_dict"
 
+# term dictionaries at least this large are matched with an Aho-Corasick automaton (if installed) instead of regex
+_AHOCORASICK_MIN_TERMS = 500
+
+@functools.lru_cache(maxsize=None)
+def _get_en_dict():
+    """
+    Shared en_US spelling dictionary, loaded on first use since loading it is expensive.
+    """
+    return enchant.Dict('en_US')
+
+def _srt_timestamp(total_ms):
+    """
+    Format a time in milliseconds as srt timestamp, e.g. 3723004 -> "01:02:03,004"
+    """
+    sec, ms = divmod(total_ms, 1000)
+    h, sec = divmod(sec, 3600)
+    m, sec = divmod(sec, 60)
+    return f"{h:02d}:{m:02d}:{sec:02d},{ms:03d}"
+
+def _parse_srt_timestamp(time_str):
+    """
+    Parse srt timestamp "HH:MM:SS,mmm" into (seconds as float, milliseconds part as int)
+    """
+    hms, ms = time_str.split(',')
+    h, m, sec = hms.split(':')
+    ms = int(ms)
+    return int(h) * 3600 + int(m) * 60 + int(sec) + ms / 1000, ms
+
+def _is_word_boundary(text, idx):
+    """
+    Same test as regex \\b: exactly one of text[idx - 1] and text[idx] is a word character.
+    """
+    before = idx > 0 and (text[idx - 1].isalnum() or text[idx - 1] == '_')
+    after = idx < len(text) and (text[idx].isalnum() or text[idx] == '_')
+    return before != after
+
+def _middle_index(text, sub):
+    """
+    Find the middle (lower middle for even counts) non-overlapping occurrence of sub in text.
+    :return: index of that occurrence, or -1 if sub is not found
+    """
+    count = text.count(sub)
+    if count == 0:
+        return -1
+    idx = text.find(sub)
+    for _ in range((count - 1) // 2):
+        idx = text.find(sub, idx + len(sub))
+    return idx
+
 class SrtSegment(object):
+    # fixed attribute layout: long transcripts hold many segments, so skip the per-instance __dict__
+    __slots__ = ('src_lang', 'tgt_lang', 'start', 'end', 'start_ms', 'end_ms', 'start_time_str', 'end_time_str',
+                 'source_text', 'duration', 'translation')
+
     def __init__(self, src_lang, tgt_lang, *args) -> None:
         self.src_lang = src_lang
         self.tgt_lang = tgt_lang
@@ -70,24 +142,16 @@ class SrtSegment(object):
             segment = args[0]
             self.start = segment['start']
             self.end = segment['end']
-            self.start_ms = int((segment['start'] * 100) % 100 * 10)
-            self.end_ms = int((segment['end'] * 100) % 100 * 10)
+            start_total_ms = int(round(segment['start'] * 1000))
+            end_total_ms = int(round(segment['end'] * 1000))
 
-            if self.start_ms == self.end_ms and int(segment['start']) == int(segment['end']):  # avoid empty time stamp
-                self.end_ms += 500
+            if start_total_ms == end_total_ms:  # avoid empty time stamp
+                end_total_ms += 500
 
-            self.start_time = timedelta(seconds=int(segment['start']), milliseconds=self.start_ms)
-            self.end_time = timedelta(seconds=int(segment['end']), milliseconds=self.end_ms)
-            if self.start_ms == 0:
-                self.start_time_str = str(0) + str(self.start_time).split('.')[0] + ',000'
-            else:
-                self.start_time_str = str(0) + str(self.start_time).split('.')[0] + ',' + \
-                                      str(self.start_time).split('.')[1][:3]
-            if self.end_ms == 0:
-                self.end_time_str = str(0) + str(self.end_time).split('.')[0] + ',000'
-            else:
-                self.end_time_str = str(0) + str(self.end_time).split('.')[0] + ',' + str(self.end_time).split('.')[1][
-                                                                                      :3]
+            self.start_ms = start_total_ms % 1000
+            self.end_ms = end_total_ms % 1000
+            self.start_time_str = _srt_timestamp(start_total_ms)
+            self.end_time_str = _srt_timestamp(end_total_ms)
             self.source_text = segment['text'].lstrip()
             self.duration = f"{self.start_time_str} --> {self.end_time_str}"
             self.translation = ""
@@ -95,22 +159,27 @@ class SrtSegment(object):
         elif isinstance(args[0], list):
             self.source_text = args[0][2]
             self.duration = args[0][1]
-            self.start_time_str = self.duration.split(" --> ")[0]
-            self.end_time_str = self.duration.split(" --> ")[1]
+            self.start_time_str, self.end_time_str = self.duration.split(" --> ")
 
             # parse the time to float
-            self.start_ms = int(self.start_time_str.split(',')[1]) / 10
-            self.end_ms = int(self.end_time_str.split(',')[1]) / 10
-            start_list = self.start_time_str.split(',')[0].split(':')
-            self.start = int(start_list[0]) * 3600 + int(start_list[1]) * 60 + int(start_list[2]) + self.start_ms / 100
-            end_list = self.end_time_str.split(',')[0].split(':')
-            self.end = int(end_list[0]) * 3600 + int(end_list[1]) * 60 + int(end_list[2]) + self.end_ms / 100
-            if len(args[0]) < 5:
+            self.start, self.start_ms = _parse_srt_timestamp(self.start_time_str)
+            self.end, self.end_ms = _parse_srt_timestamp(self.end_time_str)
+            if len(args[0]) < 4:
                 self.translation = ""
             else:
                 self.translation = args[0][3]
             
 
+    def _clone(self):
+        """
+        Shallow copy of the segment. All fields are scalars or strings, so no deepcopy is needed.
+        :return: new segment with the same fields
+        """
+        new = SrtSegment.__new__(SrtSegment)
+        for attr in SrtSegment.__slots__:
+            setattr(new, attr, getattr(self, attr))
+        return new
+
     def merge_seg(self, seg):
         """
         Merge the segment seg with the current segment in place.
@@ -133,7 +202,7 @@ class SrtSegment(object):
         :param other: Another segment that is strictly next to added segment.
         :return: new segment of the two sub-segments
         """
-        result = deepcopy(self)
+        result = self._clone()
         result.merge_seg(other)
         return result
 
@@ -142,11 +211,7 @@ class SrtSegment(object):
         remove punctuations in translation text
         :return: None
         """
-        punc_str = punctuation_dict[self.tgt_lang]["punc_str"]
-        for punc in punc_str:
-            self.translation = self.translation.replace(punc, ' ')
-        # translator = str.maketrans(punc, ' ' * len(punc))
-        # self.translation = self.translation.translate(translator)
+        self.translation = self.translation.translate(_PUNC_TRANSLATE[self.tgt_lang])
 
     def __str__(self) -> str:
         return f'{self.duration}\n{self.source_text}\n\n'
@@ -166,39 +231,80 @@ class SrtScript(object):
         self.tgt_lang = tgt_lang
         self.segments = [SrtSegment(self.src_lang, self.tgt_lang, seg) for seg in segments]
         self.client = client
+        # src_path: srt file holding the current source text; src_dirty: source text changed since then
+        self.src_path = None
+        self.src_dirty = True
+        # resolve per-language punctuation once instead of in every hot loop
+        self._src_comma = punctuation_dict[src_lang]["comma"]
+        self._tgt_comma = punctuation_dict[tgt_lang]["comma"]
+        self._src_ending = _SENTENCE_END_SET[src_lang]
+        self._tgt_punc_trans = _PUNC_TRANSLATE[tgt_lang]
+        self._aclient = None
+        self._log_files = {}  # log path -> (file handle, csv writer), opened on first write
+        self._term_pattern = None
+        self._term_map = None
+        self._term_automaton = None
+        self._dict_keys_spaced = None
+        self._dict_keys_nospace = None
 
         if self.domain != "General":
             if os.path.exists(f"{dict_path}/{self.domain}") and\
                               os.path.exists(f"{dict_path}/{self.domain}/{src_lang}.csv") and os.path.exists(f"{dict_path}/{self.domain}/{tgt_lang}.csv" ):
                 # TODO: load dictionary
                 self.dict = dict_util.term_dict(f"{dict_path}/{self.domain}", src_lang, tgt_lang)
-                ...
+                self._build_term_index()
             else:
                 self.task_logger.error(f"domain {self.domain} or related dictionary({src_lang} or {tgt_lang}) doesn't exist, fallback to general domain, this will disable correct_with_force_term and spell_check_term")
                 self.domain = "General"
 
 
+    @property
+    def aclient(self):
+        """
+        Async counterpart of self.client, created on first use with the same credentials.
+        """
+        if self._aclient is None:
+            self._aclient = AsyncOpenAI(api_key=self.client.api_key, base_url=self.client.base_url)
+        return self._aclient
+
     @classmethod
     def parse_from_srt_file(cls, src_lang, tgt_lang, task_logger, client, domain, path = None, srt_str = None):
         if path is not None:
             with open(path, 'r', encoding="utf-8") as f:
-                script_lines = [line.rstrip() for line in f.readlines()]
+                script = cls(src_lang, tgt_lang, cls._iter_srt_segments(f), task_logger, client, domain)
+            script.src_path = path
+            script.src_dirty = False
+            return script
         elif srt_str is not None:
-            script_lines = srt_str.splitlines()
+            return cls(src_lang, tgt_lang, cls._iter_srt_segments(io.StringIO(srt_str)), task_logger, client, domain)
         else:
             raise RuntimeError("need input Srt Path or Srt String")
 
-        bilingual = False
-        if script_lines[2] != '' and script_lines[3] != '':
-            bilingual = True
-        segments = []
-        if bilingual:
-            for i in range(0, len(script_lines), 5):
-                segments.append(list(script_lines[i:i + 5]))
-        else:
-            for i in range(0, len(script_lines), 4):
-                segments.append(list(script_lines[i:i + 4]))
-        return cls(src_lang, tgt_lang, segments, task_logger, client, domain)
+    @staticmethod
+    def _iter_srt_segments(lines):
+        """
+        Stream-parse srt lines into segment blocks [index, duration, source_text(, translation)].
+        Blocks are separated by blank lines, so stray blank lines are tolerated. The file is
+        treated as bilingual if its first block has a translation line; otherwise all text lines
+        of a block form its source text.
+        :param lines: iterable of lines, e.g. an opened file
+        :return: generator of segment blocks
+        """
+        bilingual = None
+        block = []
+        # trailing empty line flushes the last block
+        for line in chain(lines, ('',)):
+            line = line.rstrip()
+            if line:
+                block.append(line)
+            elif block:
+                if bilingual is None:
+                    bilingual = len(block) >= 4
+                if not bilingual and len(block) > 3:
+                    # caption spread over several lines, keep all of it as the source text
+                    block = block[:2] + ['\n'.join(block[2:])]
+                yield block
+                block = []
 
     def merge_segs(self, idx_list) -> SrtSegment:
         """
@@ -208,12 +314,18 @@ class SrtScript(object):
         """
         if not idx_list:
             raise NotImplementedError('Empty idx_list')
-        seg_result = deepcopy(self.segments[idx_list[0]])
-        if len(idx_list) == 1:
+        segs = [self.segments[idx] for idx in idx_list]
+        seg_result = segs[0]._clone()
+        if len(segs) == 1:
             return seg_result
 
-        for idx in range(1, len(idx_list)):
-            seg_result += self.segments[idx_list[idx]]
+        last = segs[-1]
+        seg_result.source_text = ' '.join([seg.source_text for seg in segs])
+        seg_result.translation = ' '.join([seg.translation for seg in segs])
+        seg_result.end_time_str = last.end_time_str
+        seg_result.end = last.end
+        seg_result.end_ms = last.end_ms
+        seg_result.duration = f"{seg_result.start_time_str} --> {seg_result.end_time_str}"
 
         return seg_result
 
@@ -226,23 +338,29 @@ class SrtScript(object):
         self.task_logger.info("Forming whole sentences...")
         merge_list = []  # a list of indices that should be merged e.g. [[0], [1, 2, 3, 4], [5, 6], [7]]
         sentence = []
-        ending_puncs = punctuation_dict[self.src_lang]["sentence_end"]
+        ending_puncs = self._src_ending
+        # whether each segment ends a sentence, computed in one pass over the source texts
+        is_ending = [len(text) > 10 and text[-1] in ending_puncs and 'vs.' not in text
+                     for text in [seg.source_text for seg in self.segments]]
         # Get each entire sentence of distinct segments, fill indices to merge_list
-        for i, seg in enumerate(self.segments):
-            if seg.source_text[-1] in ending_puncs and len(seg.source_text) > 10 and 'vs.' not in seg.source_text:
-                sentence.append(i)
+        for i, ending in enumerate(is_ending):
+            sentence.append(i)
+            if ending:
                 merge_list.append(sentence)
                 sentence = []
-            else:
-                sentence.append(i)
 
         # Reconstruct segments, each with an entire sentence
         segments = []
         for idx_list in merge_list:
             if len(idx_list) > 1:
                 self.task_logger.info("merging segments: %s", idx_list)
-            segments.append(self.merge_segs(idx_list))
+                segments.append(self.merge_segs(idx_list))
+            else:
+                # the old segment list is discarded, so a single segment can be reused as is
+                segments.append(self.segments[idx_list[0]])
 
+        if len(segments) != len(self.segments):
+            self.src_dirty = True
         self.segments = segments
 
     def remove_trans_punctuation(self):
@@ -250,34 +368,38 @@ class SrtScript(object):
         Post-process: remove all punc after translation and split
         :return: None
         """
-        for i, seg in enumerate(self.segments):
-            seg.remove_trans_punc()
+        punc_trans = self._tgt_punc_trans
+        for seg in self.segments:
+            seg.translation = seg.translation.translate(punc_trans)
         self.task_logger.info("Removed punctuation in translation.")
 
-    def set_translation(self, translate: str, id_range: tuple, model, video_name, video_link=None):
+    @retry(wait=wait_exponential(multiplier=1, min=1, max=60), stop=stop_after_attempt(10), reraise=True,
+           before_sleep=lambda state: state.args[0].task_logger.error(
+               "An error has occurred during solving unmatched lines: %s, retrying...", state.outcome.exception()))
+    async def _merge_split(self, target, input_str):
+        # handling merge sentences issue.
+        response = await self.aclient.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system",
+                 "content": "Your task is to merge or split sentences into a specified number of lines as required. You need to ensure the meaning of the sentences as much as possible, but when necessary, a sentence can be divided into two lines for output"},
+                {"role": "system", "content": "Note: You only need to output the processed {} sentences. If you need to output a sequence number, please separate it with a colon.".format(self.tgt_lang)},
+                {"role": "user", "content": 'Please split or combine the following sentences into {} sentences:\n{}'.format(target, input_str)}
+            ],
+            temperature=0.15,
+            timeout=30
+        )
+        return response.choices[0].message.content.strip()
+
+    async def set_translation(self, translate: str, id_range: tuple, model, video_name, video_link=None):
+        """
+        Assign the translated text of a chunk to the segments in id_range.
+        If the number of translated lines does not match the number of segments, ask the LLM to merge or
+        split the lines. This is a coroutine so that fix-ups of different chunks can run concurrently.
+        """
         start_seg_id = id_range[0]
         end_seg_id = id_range[1]
 
-        src_text = ""
-        for i, seg in enumerate(self.segments[start_seg_id - 1:end_seg_id]):
-            src_text += seg.source_text
-            src_text += '\n\n'
-
-        def inner_func(target, input_str):
-            # handling merge sentences issue.
-
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system",
-                     "content": "Your task is to merge or split sentences into a specified number of lines as required. You need to ensure the meaning of the sentences as much as possible, but when necessary, a sentence can be divided into two lines for output"},
-                    {"role": "system", "content": "Note: You only need to output the processed {} sentences. If you need to output a sequence number, please separate it with a colon.".format(self.tgt_lang)},
-                    {"role": "user", "content": 'Please split or combine the following sentences into {} sentences:\n{}'.format(target, input_str)}
-                ],
-                temperature=0.15
-            )
-            return response.choices[0].message.content.strip()
-
         # handling merge sentences issue.
         lines = translate.split('\n\n')
         if len(lines) < (end_seg_id - start_seg_id + 1):
@@ -288,17 +410,12 @@ class SrtScript(object):
                 print("Solving Unmatched Lines|iteration {}".format(count))
                 self.task_logger.error("Solving Unmatched Lines|iteration {}".format(count))
 
-                flag = True
-                while flag:
-                    flag = False
-                    try:
-                        translate = inner_func(end_seg_id - start_seg_id + 1, translate)
-                    except Exception as e:
-                        print("An error has occurred during solving unmatched lines:", e)
-                        print("Retrying...")
-                        self.task_logger.error("An error has occurred during solving unmatched lines:", e)
-                        self.task_logger.error("Retrying...")
-                        flag = True
+                try:
+                    translate = await self._merge_split(end_seg_id - start_seg_id + 1, translate)
+                except Exception as e:
+                    print("An error has occurred during solving unmatched lines:", e)
+                    self.task_logger.error("An error has occurred during solving unmatched lines: %s", e)
+                    break
                 lines = translate.split('\n')
 
             if len(lines) < (end_seg_id - start_seg_id + 1):
@@ -307,45 +424,54 @@ class SrtScript(object):
                 self.task_logger.error("Failed Solving unmatched lines, Manually parse needed")
 
             # FIXME: put the error log in our log file
-            if not os.path.exists("./logs"):
-                os.mkdir("./logs")
             if video_link:
-                log_file = "./logs/log_link.csv"
-                log_exist = os.path.exists(log_file)
-                with open(log_file, "a") as log:
-                    if not log_exist:
-                        log.write("range_of_text,iterations_solving,solved,file_length,video_link" + "\n")
-                    log.write(str(id_range) + ',' + str(count) + ',' + str(solved) + ',' + str(
-                        len(self.segments)) + ',' + video_link + "\n")
+                self._write_unmatched_log("./logs/log_link.csv", "video_link",
+                                          [str(id_range), count, solved, len(self.segments), video_link])
             else:
-                log_file = "./logs/log_name.csv"
-                log_exist = os.path.exists(log_file)
-                with open(log_file, "a") as log:
-                    if not log_exist:
-                        log.write("range_of_text,iterations_solving,solved,file_length,video_name" + "\n")
-                    log.write(str(id_range) + ',' + str(count) + ',' + str(solved) + ',' + str(
-                        len(self.segments)) + ',' + video_name + "\n")
+                self._write_unmatched_log("./logs/log_name.csv", "video_name",
+                                          [str(id_range), count, solved, len(self.segments), video_name])
             # print(lines)
 
+        # naive way to due with merge translation problem
+        # TODO: need a smarter solution
+        lines = [line.lstrip(' \n') for line in lines if "Note:" not in line]  # to avoid note
         for i, seg in enumerate(self.segments[start_seg_id - 1:end_seg_id]):
-            # naive way to due with merge translation problem
-            # TODO: need a smarter solution
-
             if i < len(lines):
-                if "Note:" in lines[i]:  # to avoid note
-                    lines.remove(lines[i])
-                    max_num -= 1
-                    if i == len(lines) - 1:
-                        break
-                if lines[i][0] in [' ', '\n']:
-                    lines[i] = lines[i][1:]
                 seg.translation = lines[i]
 
+    def _write_unmatched_log(self, log_file, video_column, row):
+        """
+        Append a row to the unmatched lines log. The file is opened once and kept open until close().
+        """
+        if log_file not in self._log_files:
+            os.makedirs(os.path.dirname(log_file), exist_ok=True)
+            log_exist = os.path.exists(log_file)
+            log = open(log_file, "a", newline='')
+            writer = csv.writer(log)
+            if not log_exist:
+                writer.writerow(["range_of_text", "iterations_solving", "solved", "file_length", video_column])
+            self._log_files[log_file] = (log, writer)
+        self._log_files[log_file][1].writerow(row)
+
+    def close(self):
+        """
+        Close the unmatched lines log files, if any were opened.
+        :return: None
+        """
+        for log, _ in self._log_files.values():
+            log.close()
+        self._log_files = {}
+
+    def __del__(self):
+        # _log_files is missing if __init__ failed early
+        if getattr(self, "_log_files", None):
+            self.close()
+
     def split_seg(self, seg, text_threshold, time_threshold):
         # evenly split seg to 2 parts and add new seg into self.segments
         # ignore the initial comma to solve the recursion problem
-        src_comma_str = punctuation_dict[self.src_lang]["comma"]
-        tgt_comma_str = punctuation_dict[self.tgt_lang]["comma"]
+        src_comma_str = self._src_comma
+        tgt_comma_str = self._tgt_comma
 
         if len(seg.source_text) > 2:
             if seg.source_text[:2] == src_comma_str:
@@ -357,24 +483,15 @@ class SrtScript(object):
         translation = seg.translation
 
         # split the text based on commas
-        src_commas = [m.start() for m in re.finditer(src_comma_str, source_text)]
-        trans_commas = [m.start() for m in re.finditer(tgt_comma_str, translation)]
-        if len(src_commas) != 0:
-            src_split_idx = src_commas[len(src_commas) // 2] if len(src_commas) % 2 == 1 else src_commas[
-                len(src_commas) // 2 - 1]
-        else:
+        src_split_idx = _middle_index(source_text, src_comma_str)
+        trans_split_idx = _middle_index(translation, tgt_comma_str)
+        if src_split_idx == -1:
             # split the text based on spaces
-            src_space = [m.start() for m in re.finditer(' ', source_text)]
-            if len(src_space) > 0:
-                src_split_idx = src_space[len(src_space) // 2] if len(src_space) % 2 == 1 else src_space[
-                    len(src_space) // 2 - 1]
-            else:
+            src_split_idx = _middle_index(source_text, ' ')
+            if src_split_idx == -1:
                 src_split_idx = 0
 
-        if len(trans_commas) != 0:
-            trans_split_idx = trans_commas[len(trans_commas) // 2] if len(trans_commas) % 2 == 1 else trans_commas[
-                len(trans_commas) // 2 - 1]
-        else:
+        if trans_split_idx == -1:
             trans_split_idx = len(translation) // 2
 
             # to avoid split English word
@@ -430,6 +547,7 @@ class SrtScript(object):
             if len(seg.translation) > text_threshold and (seg.end - seg.start) > time_threshold:
                 seg_list = self.split_seg(seg, text_threshold, time_threshold)
                 self.task_logger.info("splitting segment {} in to {} parts".format(i + 1, len(seg_list)))
+                self.src_dirty = True
                 segments += seg_list
             else:
                 segments.append(seg)
@@ -463,45 +581,112 @@ class SrtScript(object):
         if self.domain == "General":
             self.task_logger.info("General domain could not perform correct_with_force_term. skip this step.")
             pass
-        else:
-            keywords = list(self.dict.keys())
-            keywords.sort(key=lambda x: len(x), reverse=True)
+        elif self.dict:
+            if self._term_pattern is None:
+                self._build_term_index()
 
+            for i, seg in enumerate(self.segments):
+                def replace_term(word):
+                    term = self.dict.get(word)
+                    self.task_logger.info(
+                        "replace term: " + word + " --> " + term + " in time stamp {}".format(i + 1))
+                    return term
+
+                source_text = self._replace_terms(seg.source_text, replace_term)
+                if source_text != seg.source_text:
+                    seg.source_text = source_text
+                    self.src_dirty = True
+                    self.task_logger.info("source text becomes: " + seg.source_text)
+
+    def _build_term_index(self):
+        """
+        Precompute lookup structures for the term dictionary.
+        All terms are compiled into a single alternation regex so each segment is scanned only once; longer
+        terms come first so they win over their prefixes (e.g. "hydralisk" over "hydra"). Terms are also
+        split by whether they contain a space, which is the candidate pool used by fetchfunc.
+        :return: None
+        """
+        keywords = sorted(self.dict.keys(), key=len, reverse=True)
+        self._term_pattern = re.compile(r"\b(" + "|".join(re.escape(word) for word in keywords) + r")(?:es|s)?\b",
+                                        flags=re.IGNORECASE)
+        self._term_map = {word.lower(): word for word in keywords}
+        self._term_automaton = None
+        if ahocorasick is not None and len(keywords) >= _AHOCORASICK_MIN_TERMS:
+            automaton = ahocorasick.Automaton()
             for word in keywords:
-                for i, seg in enumerate(self.segments):
-                    if word in seg.source_text.lower():
-                        seg.source_text = re.sub(fr"({word}es|{word}s?)\b", "{}".format(self.dict.get(word)),
-                                                seg.source_text, flags=re.IGNORECASE)
-                        self.task_logger.info(
-                            "replace term: " + word + " --> " + self.dict.get(word) + " in time stamp {}".format(
-                                i + 1))
-                        self.task_logger.info("source text becomes: " + seg.source_text)
+                automaton.add_word(word.lower(), (len(word), word))
+            automaton.make_automaton()
+            self._term_automaton = automaton
+        self._dict_keys_spaced = [word for word in self.dict if " " in word]
+        self._dict_keys_nospace = [word for word in self.dict if " " not in word]
 
+    def _replace_terms(self, text, replace_term):
+        """
+        Replace every dictionary term in text, together with an optional plural suffix ("es" or "s").
+        Matching is case-insensitive and limited to whole words; at each position the longest term wins.
+        Large dictionaries use the Aho-Corasick automaton so the cost does not grow with the number of terms,
+        otherwise the precompiled alternation regex is used.
+        :param text: text to correct
+        :param replace_term: callback mapping a dictionary key to its replacement
+        :return: corrected text
+        """
+        lowered = text.lower()
+        # lower() can change the length of some characters, which would break index mapping
+        if self._term_automaton is None or len(lowered) != len(text):
+            return self._term_pattern.sub(lambda m: replace_term(self._term_map[m.group(1).lower()]), text)
+
+        # order candidates like the regex does: leftmost start first, then longest term first
+        candidates = sorted((end - length + 1, -length, end + 1, word)
+                            for end, (length, word) in self._term_automaton.iter(lowered))
+        parts = []
+        pos = 0
+        for start, _, end, word in candidates:
+            if start < pos or not _is_word_boundary(text, start):
+                continue
+            for suffix in ("es", "s", ""):
+                if lowered.startswith(suffix, end) and _is_word_boundary(text, end + len(suffix)):
+                    break
+            else:
+                continue
+            parts.append(text[pos:start])
+            parts.append(replace_term(word))
+            pos = end + len(suffix)
+        parts.append(text[pos:])
+        return ''.join(parts)
 
     def fetchfunc(self, word, threshold):
-        import enchant
-        result = word
-        distance = 0
-        threshold = threshold * len(word)
-        temp = ""
-        for matched in self.dict:
-            if (" " in matched and " " in word) or (" " not in matched and " " not in word):
-                if enchant.utils.levenshtein(word, matched) < enchant.utils.levenshtein(word, temp):
-                    temp = matched
-        if enchant.utils.levenshtein(word, temp) < threshold:
-            distance = enchant.utils.levenshtein(word, temp)
-            result = temp
-        return distance, result
+        """
+        Find the closest dictionary term to word by Levenshtein distance.
+        :param word: word (or two-word chunk) to look up
+        :param threshold: maximum distance allowed, as a ratio of len(word) (exclusive)
+        :return: (distance, matched term), or (0, word) if nothing is close enough
+        """
+        if self._term_pattern is None:
+            self._build_term_index()
+        pool = self._dict_keys_spaced if " " in word else self._dict_keys_nospace
+        # distance must be strictly below threshold * len(word)
+        score_cutoff = math.ceil(threshold * len(word)) - 1
+        if score_cutoff < 0:
+            return 0, word
+        match = process.extractOne(word, pool, scorer=rf_distance.Levenshtein.distance, score_cutoff=score_cutoff)
+        if match is None:
+            return 0, word
+        return match[1], match[0]
 
     def extract_words(self, sentence, n):
         # this function split the sentence to chunks by n of words
         # e.g. sentence: "this, is a sentence", n = 2
-        # result: ["this,", "is", "a", ["sentence"], ["this,", "is"], "is a", "a sentence"]
+        # chunks: "this, is", "is a", "a sentence", "this,", "is", "a", "sentence"
+        # yields (chunk, lowercased chunk without trailing punctuation, length of the stripped chunk),
+        # skipping chunks that are only punctuation
         words = sentence.split()
-        res = []
         for j in range(n, 0, -1):
-            res += [words[i:i + j] for i in range(len(words) - j + 1)]
-        return res
+            for i in range(len(words) - j + 1):
+                word = ' '.join(words[i:i + j])
+                stripped = word.rstrip('.\n,!?')
+                if not stripped:  # punctuation-only chunk such as "..." or "?!", nothing to check
+                    continue
+                yield word, stripped.lower(), len(stripped)
 
     def spell_check_term(self):
         self.task_logger.info("performing spell check")
@@ -509,87 +694,71 @@ class SrtScript(object):
         # check domain
         if self.domain == "General":
             self.task_logger.info("General domain could not perform spell_check_term. skip this step.")
-            pass
+            return
+        if enchant is None:
+            self.task_logger.error("pyenchant is not available, skip spell_check_term.")
+            return
 
-        import enchant
-        dict = enchant.Dict('en_US')
+        en_dict = _get_en_dict()
 
         for seg in tqdm(self.segments):
-            ready_words = self.extract_words(seg.source_text, 2)
-            for i in range(len(ready_words)):
-                word_list = ready_words[i]
-                word, real_word, pos = self.get_real_word(word_list)
-                if not dict.check(real_word) and (real_word not in self.dict.keys()):
+            for word, real_word, pos in self.extract_words(seg.source_text, 2):
+                if not en_dict.check(real_word) and (real_word not in self.dict.keys()):
                     distance, correct_term = self.fetchfunc(real_word, 0.3)
                     if distance != 0:
                         seg.source_text = re.sub(word[:pos], correct_term, seg.source_text, flags=re.IGNORECASE)
+                        self.src_dirty = True
                         self.task_logger.info(
                             "replace: " + word[:pos] + " to " + correct_term + "\t distance = " + str(distance))
 
-    def get_real_word(self, word_list: list):
-        word = ""
-        for w in word_list:
-            word += f"{w} "
-        word = word[:-1]  # "this, is"
-        if word[-2:] == ".\n":
-            real_word = word[:-2].lower()
-            n = -2
-        elif word[-1:] in [".", "\n", ",", "!", "?"]:
-            real_word = word[:-1].lower()
-            n = -1
-        else:
-            real_word = word.lower()
-            n = 0
-        return word, real_word, len(word) + n
-
     ## WRITE AND READ FUNCTIONS ##
 
     def get_source_only(self):
         # return a string with pure source text
-        result = ""
+        parts = []
         for i, seg in enumerate(self.segments):
-            result += f'{seg.source_text}\n\n\n'  # f'SENTENCE {i+1}: {seg.source_text}\n\n\n'
+            parts.append(f'{seg.source_text}\n\n\n')  # f'SENTENCE {i+1}: {seg.source_text}\n\n\n'
 
-        return result
+        return ''.join(parts)
 
-    def reform_src_str(self):
-        result = ""
+    def iter_src_str(self):
+        # yield the srt text of each segment, so writers can stream instead of building one big string
         for i, seg in enumerate(self.segments):
-            result += f'{i + 1}\n'
-            result += str(seg)
-        return result
+            yield f'{i + 1}\n{seg.duration}\n{seg.source_text}\n\n'
 
-    def reform_trans_str(self):
-        result = ""
+    def iter_trans_str(self):
         for i, seg in enumerate(self.segments):
-            result += f'{i + 1}\n'
-            result += seg.get_trans_str()
-        return result
+            yield f'{i + 1}\n{seg.duration}\n{seg.translation}\n\n'
 
-    def form_bilingual_str(self):
-        result = ""
+    def iter_bilingual_str(self):
         for i, seg in enumerate(self.segments):
-            result += f'{i + 1}\n'
-            result += seg.get_bilingual_str()
-        return result
+            yield f'{i + 1}\n{seg.duration}\n{seg.source_text}\n{seg.translation}\n\n'
+
+    def reform_src_str(self):
+        return ''.join(self.iter_src_str())
+
+    def reform_trans_str(self):
+        return ''.join(self.iter_trans_str())
+
+    def form_bilingual_str(self):
+        return ''.join(self.iter_bilingual_str())
 
     def write_srt_file_src(self, path: str):
         # write srt file to path
-        with open(path, "w", encoding='utf-8') as f:
-            f.write(self.reform_src_str())
-        pass
+        with open(path, "w", encoding='utf-8', buffering=1 << 20) as f:
+            f.writelines(self.iter_src_str())
+        self.src_path = path
+        self.src_dirty = False
 
     def write_srt_file_translate(self, path: str):
-        self.task_logger.info("writing to " + path)
-        with open(path, "w", encoding='utf-8') as f:
-            f.write(self.reform_trans_str())
-        pass
+        self.task_logger.info("writing to " + str(path))
+        with open(path, "w", encoding='utf-8', buffering=1 << 20) as f:
+            f.writelines(self.iter_trans_str())
 
     def write_srt_file_bilingual(self, path: str):
-        self.task_logger.info("writing to " + path)
-        with open(path, "w", encoding='utf-8') as f:
-            f.write(self.form_bilingual_str())
-        pass
+        self.task_logger.info("writing to " + str(path))
+        with open(path, "w", encoding='utf-8', buffering=1 << 20) as f:
+            f.writelines(self.iter_bilingual_str())
 
     def realtime_write_srt(self, path, range, length, idx):
         # DEPRECATED
@@ -619,25 +788,24 @@ class SrtScript(object):
         pass
 
 def split_script(script_in, chunk_size=1000):
+    # greedily group the '\n\n' separated sentences into chunks, slicing the sentence list by index
     script_split = script_in.split('\n\n')
     script_arr = []
     range_arr = []
-    start = 1
-    end = 0
-    script = ""
-    for sentence in script_split:
-        if len(script) + len(sentence) + 1 <= chunk_size:
-            script += sentence + '\n\n'
-            end += 1
+    start = 0  # index of the first sentence in the current chunk
+    script_len = 0
+    for end, sentence in enumerate(script_split):
+        if script_len + len(sentence) + 1 <= chunk_size:
+            script_len += len(sentence) + 2
         else:
-            range_arr.append((start, end))
-            start = end + 1
-            end += 1
-            script_arr.append(script.strip())
-            script = sentence + '\n\n'
-    if script.strip():
-        script_arr.append(script.strip())
-        range_arr.append((start, len(script_split) - 1))
+            script_arr.append('\n\n'.join(script_split[start:end]).strip())
+            range_arr.append((start + 1, end))
+            start = end
+            script_len = len(sentence) + 2
+    script = '\n\n'.join(script_split[start:]).strip()
+    if script:
+        script_arr.append(script)
+        range_arr.append((start + 1, len(script_split) - 1))
 
     assert len(script_arr) == len(range_arr)
     return script_arr, range_arr
@@ -1,7 +1,6 @@
 import threading
 import time
-
-import openai
+from concurrent.futures import ThreadPoolExecutor
 
 # pytube deprecated
 # from pytube import YouTube
@@ -10,29 +9,104 @@ import yt_dlp
 from os import getenv, getcwd
 from pathlib import Path
 from enum import Enum, auto
+import copy
+import functools
 import logging
+import logging.handlers
 import subprocess
+from pprint import pformat
 from src.srt_util.srt import SrtScript
 from src.srt_util.srt2ass import srt2ass
 from time import time, strftime, gmtime, sleep
 from src.translators.translator import Translator
-from src.ASR.ASR import get_transcript
+from src.ASR.ASR import get_transcript, load_audio_pcm
 from openai import OpenAI
 
 import shutil
 from datetime import datetime
 
-class TaskStatus(str, Enum):
+# read once at import; tasks pass their key to the OpenAI client explicitly instead of relying on the environment
+_OPENAI_KEY = getenv("OPENAI_API_KEY")
+
+# OpenAI client for the environment key, shared across tasks so its httpx connection pool is reused
+_openai_client = None
+_openai_client_lock = threading.Lock()
+
+def _get_openai_client(api_key):
+    """
+    Returns the shared OpenAI client if api_key is the environment key, creating it on first use.
+    The underlying httpx client is thread-safe, so concurrent tasks can share it.
+    Keys entered by users get their own client, so they are not kept for the life of the process.
+    """
+    global _openai_client
+    if api_key != _OPENAI_KEY:
+        return OpenAI(api_key = api_key)
+    with _openai_client_lock:
+        if _openai_client is None:
+            _openai_client = OpenAI(api_key = api_key)
+        return _openai_client
+
+# hardware H.264 encoders in order of preference, with the ffmpeg arguments each one needs
+# (vaapi needs its device and the frames uploaded after the cpu-side subtitles filter)
+_HW_ENCODERS = {
+    "h264_nvenc": {"input_args": [], "filter": "", "encode_args": ["-c:v", "h264_nvenc", "-preset", "p1"]},
+    "h264_vaapi": {"input_args": ["-vaapi_device", "/dev/dri/renderD128"], "filter": ",format=nv12,hwupload", "encode_args": ["-c:v", "h264_vaapi"]},
+    "h264_qsv": {"input_args": [], "filter": "", "encode_args": ["-c:v", "h264_qsv"]},
+}
+
+# hardware encoders that failed an encode in this process, skipped from then on
+_failed_hw_encoders = set()
+
+@functools.lru_cache(maxsize=None)
+def _detect_hw_encoders():
+    """
+    Probes ffmpeg once for usable hardware H.264 encoders, in order of preference.
+    ffmpeg builds list these encoders whether or not the hardware is present, so each listed
+    encoder is checked with a one-frame test encode.
+    """
+    try:
+        encoders = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"],
+                                  capture_output=True, text=True).stdout
+    except OSError:
+        return ()
+    usable = []
+    for encoder, hw in _HW_ENCODERS.items():
+        if encoder not in encoders:
+            continue
+        test = subprocess.run(["ffmpeg", "-hide_banner", "-loglevel", "error", *hw["input_args"],
+                               "-f", "lavfi", "-i", "color=black:s=256x256:d=0.1",
+                               "-vf", f"null{hw['filter']}", *hw["encode_args"],
+                               "-frames:v", "1", "-f", "null", "-"],
+                              capture_output=True)
+        if test.returncode == 0:
+            usable.append(encoder)
+    return tuple(usable)
+
+# ISO 639-2 codes for the supported languages, used to tag the muxed subtitle track
+ISO639_2_MAP = {
+    "EN": "eng",
+    "ZH": "chi",
+    "ES": "spa",
+    "FR": "fre",
+    "DE": "ger",
+    "RU": "rus",
+    "JA": "jpn",
+    "AR": "ara",
+    "KR": "kor",
+}
+
+class TaskStatus(Enum):
     """
     An enumeration class representing the different statuses a task can have in the translation pipeline.
+    Use `.name` where the status is needed as a string.
     TODO: add translation progress indicator (%).
     """
-    CREATED = 'CREATED'
-    INITIALIZING_ASR = 'INITIALIZING_ASR'
-    PRE_PROCESSING = 'PRE_PROCESSING'
-    TRANSLATING = 'TRANSLATING'
-    POST_PROCESSING = 'POST_PROCESSING'
-    OUTPUT_MODULE = 'OUTPUT_MODULE'
+    CREATED = auto()
+    INITIALIZING_ASR = auto()
+    PRE_PROCESSING = auto()
+    TRANSLATING = auto()
+    POST_PROCESSING = auto()
+    OUTPUT_MODULE = auto()
 
 class Task:
     """
@@ -43,28 +117,25 @@ class Task:
 
     @property
     def status(self):
-        with self.__status_lock:
-            return self.__status
+        return self.__status
 
     @status.setter
     def status(self, new_status):
         """
-        Sets the new status of the task, ensuring thread safety with a lock.
+        Sets the new status of the task. Status is only ever replaced as a whole, which is atomic, so no lock is needed.
         """
-        with self.__status_lock:
-            self.__status = new_status
+        self.__status = new_status
 
     def __init__(self, task_id, task_local_dir, task_cfg):
         """
         Constructor for initializing a task with its ID, local directory, and configuration settings.
         """
-        self.__status_lock = threading.Lock()
         self.__status = TaskStatus.CREATED
         self.gpu_status = 0
 
         self.task_id = task_id
         
-        self.task_local_dir = task_local_dir
+        self.task_local_dir = Path(task_local_dir)
         self.ASR_setting = task_cfg["ASR"]
         self.translation_setting = task_cfg["translation"]
         self.translation_model = self.translation_setting["model"]
@@ -76,6 +147,15 @@ class Task:
         self.pre_setting = task_cfg["pre_process"]
         self.post_setting = task_cfg["post_process"]
         self.chunk_size = task_cfg["translation"]["chunk_size"]
+
+        # file paths used across the pipeline
+        self.results_dir = self.task_local_dir / "results"
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self.src_srt_path = self.task_local_dir / f"task_{task_id}_{self.source_lang}.srt"
+        self.processed_srt_path = self.task_local_dir / f"{task_id}_processed.srt"
+        self.mp3_path = self.task_local_dir / f"task_{task_id}.mp3"
+        self.mp4_path = self.task_local_dir / f"task_{task_id}.mp4"
+        self.m4a_path = self.task_local_dir / f"task_{task_id}.m4a"
         
         self.audio_path = None
         self.SRT_Script = None
@@ -88,39 +168,37 @@ class Task:
         self.task_logger = logging.getLogger(f"task_{task_id}")
         logfmt = "%(asctime)s (%(module)s:%(lineno)d) %(levelname)s: %(message)s"
         self.task_logger.setLevel(logging.INFO)
-        self.log_dir = "{}/{}_{}.log".format(task_local_dir, f"task_{task_id}", datetime.now().strftime("%m%d%Y_%H%M%S"))
+        self.log_dir = str(self.task_local_dir / f"task_{task_id}_{datetime.now().strftime('%m%d%Y_%H%M%S')}.log")
         task_file_handler = logging.FileHandler(self.log_dir, 'w', encoding='utf-8')
         task_file_handler.setFormatter(logging.Formatter(logfmt)) 
-        self.task_logger.addHandler(task_file_handler)
+        # buffer records in memory and write them in batches; errors are written immediately
+        self.log_handler = logging.handlers.MemoryHandler(capacity=500, flushLevel=logging.ERROR, target=task_file_handler)
+        self.task_logger.addHandler(self.log_handler)
         # logging.basicConfig(level=logging.INFO, format=logfmt, handlers=[
         #     logging.FileHandler(
         #         "{}/{}_{}.log".format(task_local_dir, f"task_{task_id}", datetime.now().strftime("%m%d%Y_%H%M%S")),
         #         'w', encoding='utf-8')])
         
         print(f"Task ID: {self.task_id}")
-        self.task_logger.info(f"Task ID: {self.task_id}")
+        self.task_logger.info("Task ID: %s", self.task_id)
         if "OPENAI_API_KEY" in task_cfg:
             self.task_logger.info("Using OPENAI_API_KEY from gradio interface.")
             self.api_key = task_cfg["OPENAI_API_KEY"]
         else:
             self.task_logger.info("Using OPENAI_API_KEY from environment variable.")
-            self.api_key = getenv("OPENAI_API_KEY")
-        self.task_logger.info(f"{self.source_lang} -> {self.target_lang} task in {self.field}")
-        self.task_logger.info(f"Translation Model: {self.translation_model}")
-        self.task_logger.info(f"Chunk Size: {self.chunk_size}")
-        self.task_logger.info(f"ASR Model: {self.ASR_setting['ASR_model']}")
-        self.task_logger.info(f"subtitle_type: {self.output_type['subtitle']}")
-        self.task_logger.info(f"video_ouput: {self.output_type['video']}")
-        self.task_logger.info(f"bilingual_ouput: {self.output_type['bilingual']}")
-        self.task_logger.info("Pre-process setting:")
-        for key in self.pre_setting:
-            self.task_logger.info(f"{key}: {self.pre_setting[key]}")
-        self.task_logger.info("Post-process setting:")
-        for key in self.post_setting:
-            self.task_logger.info(f"{key}: {self.post_setting[key]}")
+            self.api_key = _OPENAI_KEY
+        self.task_logger.info("%s -> %s task in %s", self.source_lang, self.target_lang, self.field)
+        self.task_logger.info("Translation Model: %s", self.translation_model)
+        self.task_logger.info("Chunk Size: %s", self.chunk_size)
+        self.task_logger.info("ASR Model: %s", self.ASR_setting['ASR_model'])
+        self.task_logger.info("subtitle_type: %s", self.output_type['subtitle'])
+        self.task_logger.info("video_ouput: %s", self.output_type['video'])
+        self.task_logger.info("bilingual_ouput: %s", self.output_type['bilingual'])
+        self.task_logger.info("Pre-process setting:\n%s", pformat(self.pre_setting))
+        self.task_logger.info("Post-process setting:\n%s", pformat(self.post_setting))
         
         # init openai client
-        self.client = OpenAI(api_key = self.api_key)
+        self.client = _get_openai_client(self.api_key)
         # initialize translator
         self.translator = Translator(self.translation_model, 
                                      self.source_lang, 
@@ -173,13 +251,13 @@ class Task:
         # shoud be modified after we incorporate more ASR methods
         method = self.ASR_setting["ASR_model"]
         # whisper_model = self.ASR_setting["whisper_config"]["whisper_model"]
-        src_srt_path = self.task_local_dir.joinpath(f"task_{self.task_id}_{self.source_lang}.srt")
-
+        # ASR is skipped when the source srt already exists, only prepare the audio if it will be used
+        audio_input = self.prepare_audio() if not self.src_srt_path.exists() else self.audio_path
         # get transcript
         transcript = get_transcript(method, 
-                                    src_srt_path, 
+                                    self.src_srt_path, 
                                     self.source_lang, 
-                                    self.audio_path, 
+                                    audio_input, 
                                     self.client, 
                                     self.task_logger,
                                     pre_load_asr_model)
@@ -200,10 +278,16 @@ class Task:
                                             self.client, 
                                             self.field)
             # save the srt script to local
-            self.SRT_Script.write_srt_file_src(src_srt_path)
+            self.SRT_Script.write_srt_file_src(self.src_srt_path)
         else:
             raise RuntimeError(f"Failed to get transcript from audio file: {self.audio_path}")
         
+    def prepare_audio(self):
+        """
+        Returns the audio input for the ASR module. Subclasses that need to extract the audio first override this.
+        """
+        return self.audio_path
+
     # Module 2: SRT preprocess: perform preprocess steps
     def preprocess(self):
         """
@@ -217,24 +301,21 @@ class Task:
             self.SRT_Script.spell_check_term()
         if self.pre_setting["term_correct"]:
             self.SRT_Script.correct_with_force_term()
-        processed_srt_path_src = str(Path(self.task_local_dir) / f'{self.task_id}_processed.srt')
-        self.SRT_Script.write_srt_file_src(processed_srt_path_src)
+        if self.SRT_Script.src_dirty or self.SRT_Script.src_path is None:
+            processed_srt_path_src = self.processed_srt_path
+            self.SRT_Script.write_srt_file_src(processed_srt_path_src)
+        else:
+            # source text is unchanged since it was last read or written, reuse that file
+            processed_srt_path_src = self.SRT_Script.src_path
+            self.task_logger.info(f"source srt unchanged, reuse {processed_srt_path_src}")
 
         if self.output_type["subtitle"] == "ass":
             self.task_logger.info("write English .srt file to .ass")
-            assSub_src = srt2ass(processed_srt_path_src, "default", "No", "Modest")
+            assSub_src = srt2ass(str(processed_srt_path_src), "default", "No", "Modest")
             self.task_logger.info('ASS subtitle saved as: ' + assSub_src)
         self.script_input = self.SRT_Script.get_source_only()
         pass
     
-    def update_translation_progress(self, new_progress):
-        """
-        (UNUSED)
-        Updates the progress (%) of the translation process.
-        """
-        if self.progress == TaskStatus.TRANSLATING:
-            self.progress = TaskStatus.TRANSLATING.value[0], new_progress
-
     # Module 3: perform srt translation
     def translation(self):
         """
@@ -243,6 +324,7 @@ class Task:
         self.task_logger.info("---------------------Start Translation--------------------")
         self.translator.set_srt(self.SRT_Script)
         self.translator.translate()
+        self.SRT_Script.close()
     
     # Module 4: perform srt post process steps
     def postprocess(self):
@@ -268,14 +350,14 @@ class Task:
         subtitle_type = self.output_type["subtitle"]
         is_bilingual = self.output_type["bilingual"]
 
-        results_dir =f"{self.task_local_dir}/results"
-
-        subtitle_path = f"{results_dir}/{self.task_id}_{self.target_lang}.srt"
+        subtitle_path = self.results_dir / f"{self.task_id}_{self.target_lang}.srt"
         self.SRT_Script.write_srt_file_translate(subtitle_path)
         if is_bilingual:
-            subtitle_path = f"{results_dir}/{self.task_id}_{self.source_lang}_{self.target_lang}.srt"
+            subtitle_path = self.results_dir / f"{self.task_id}_{self.source_lang}_{self.target_lang}.srt"
             self.SRT_Script.write_srt_file_bilingual(subtitle_path)
 
+        # the final subtitle path, as the string used by the ffmpeg commands and returned to the caller
+        subtitle_path = str(subtitle_path)
         if subtitle_type == "ass":
             self.task_logger.info("write .srt file to .ass")
             subtitle_path = srt2ass(subtitle_path, "default", "No", "Modest")
@@ -285,29 +367,82 @@ class Task:
 
         # encode to .mp4 video file
         if video_out and self.video_path is not None:
-            self.task_logger.info("encoding video file")
-            self.task_logger.info(f'ffmpeg comand: \nffmpeg -i {self.video_path} -vf "subtitles={subtitle_path}" {results_dir}/{self.task_id}.mp4')
-            subprocess.run(
-                ["ffmpeg",
-                    "-i", self.video_path,
-                    "-vf", f"subtitles={subtitle_path}",
-                    f"{results_dir}/{self.task_id}.mp4"])
-            final_res = f"{results_dir}/{self.task_id}.mp4"
+            video_res = self.results_dir / f"{self.task_id}.mp4"
+            # stream copy fails for codecs mp4 can't hold, burn the subtitle in (re-encoding) in that case
+            if self.output_type.get("hardsub", False) or not self.mux_subtitles(subtitle_path, video_res):
+                self.burn_subtitles(subtitle_path, video_res)
+            final_res = str(video_res)
 
         self.t_e = time()
         self.task_logger.info(
             "Pipeline finished, time duration:{}".format(strftime("%H:%M:%S", gmtime(self.t_e - self.t_s))))
         return final_res
     
+    def mux_subtitles(self, subtitle_path, video_res):
+        """
+        Adds the subtitle to the video as a soft subtitle track. Video and audio streams are copied, not re-encoded.
+        Returns False if ffmpeg fails, e.g. when the input streams can't be stored in .mp4 as they are.
+        """
+        self.task_logger.info("muxing subtitle track into video file")
+        cmd = ["ffmpeg", "-y",
+                "-i", str(self.video_path),
+                "-i", subtitle_path,
+                "-map", "0:v", "-map", "0:a?", "-map", "1:0",
+                "-c:v", "copy", "-c:a", "copy", "-c:s", "mov_text",
+                "-metadata:s:s:0", f"language={ISO639_2_MAP.get(self.target_lang, 'und')}",
+                str(video_res)]
+        self.task_logger.info(f"ffmpeg comand: \n{' '.join(cmd)}")
+        if subprocess.run(cmd).returncode != 0:
+            self.task_logger.info("muxing subtitle track failed, burning subtitles into the video instead")
+            return False
+        return True
+
+    def burn_subtitles(self, subtitle_path, video_res):
+        """
+        Burns the subtitle into the video frames, using a hardware encoder when one is available.
+        """
+        self.task_logger.info("encoding video file")
+        for encoder in _detect_hw_encoders():
+            if encoder in _failed_hw_encoders:
+                continue
+            self.task_logger.info(f"using hardware encoder: {encoder}")
+            hw = _HW_ENCODERS[encoder]
+            cmd = ["ffmpeg", "-y", *hw["input_args"],
+                    "-i", str(self.video_path),
+                    "-vf", f"subtitles={subtitle_path}{hw['filter']}",
+                    *hw["encode_args"],
+                    str(video_res)]
+            self.task_logger.info(f"ffmpeg comand: \n{' '.join(cmd)}")
+            if subprocess.run(cmd).returncode == 0:
+                return
+            # don't try this encoder again for later tasks, use the next one or libx264
+            _failed_hw_encoders.add(encoder)
+            self.task_logger.info(f"{encoder} encoding failed")
+        self.task_logger.info("using software encoder: libx264")
+        cmd = ["ffmpeg", "-y",
+                "-i", str(self.video_path),
+                "-vf", f"subtitles={subtitle_path}",
+                str(video_res)]
+        self.task_logger.info(f"ffmpeg comand: \n{' '.join(cmd)}")
+        if subprocess.run(cmd).returncode != 0:
+            raise RuntimeError(f"Failed to encode video file: {video_res}")
+
     def run_pipeline(self, pre_load_asr_model = None):
         """
         Executes the entire pipeline process for the task.
         """
-        self.get_srt_class(pre_load_asr_model)
-        self.preprocess()
-        self.translation()
-        self.postprocess()
-        self.result = self.output_render()
+        try:
+            self.get_srt_class(pre_load_asr_model)
+            self.preprocess()
+            self.translation()
+            self.postprocess()
+            self.result = self.output_render()
+        finally:
+            # the log file is returned to the user once the pipeline ends, write it out and release the file
+            self.task_logger.removeHandler(self.log_handler)
+            file_handler = self.log_handler.target
+            self.log_handler.close()
+            file_handler.close()
         
         # print(self.result)
 
@@ -318,13 +453,18 @@ class YoutubeTask(Task):
         self.youtube_url = youtube_url
         self.video_resolution = task_cfg["video_download"]["resolution"]
         # self.model = model
+        # fetch the video metadata once, so a bad link fails early and both downloads reuse it
+        with yt_dlp.YoutubeDL() as ydl:
+            try:
+                self.video_info = ydl.extract_info(youtube_url, download=False, process=False)
+            except yt_dlp.utils.YoutubeDLError as e:
+                self.task_logger.error(e)
+                raise RuntimeError(f"Failed to fetch video info {youtube_url}")
 
     def run(self, pre_load_asr_model = None):
 
         self.task_logger.info(f"Youtube URL: {self.youtube_url}")
         self.task_logger.info(f"Video Resolution: {self.video_resolution}")
-        video_download_path = f"{self.task_local_dir}/task_{self.task_id}.mp4"
-        audio_download_dir = f"{self.task_local_dir}/task_{self.task_id}.mp3"
 
         if self.video_resolution == "best":
             video_format = "bestvideo[ext=mp4]+bestaudio/bestvideo"
@@ -335,32 +475,23 @@ class YoutubeTask(Task):
         
         video_opts = {
             'format': video_format, 
-            'outtmpl': video_download_path,
+            'outtmpl': str(self.mp4_path),
         }
 
         audio_opts = {
             'format': 'bestaudio[ext=mp3]/bestaudio', 
-            'outtmpl': audio_download_dir,
+            'outtmpl': str(self.mp3_path),
         }
 
-        with yt_dlp.YoutubeDL(video_opts) as ydl:
-            try:
-                ydl.download([self.youtube_url])
-            except yt_dlp.utils.DownloadError as e:
-                self.task_logger.error(e)
-                raise RuntimeError(f"Failed to download video {self.youtube_url}")
-            ydl.close()
+        # video and audio are independent downloads, fetch them in parallel
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            video_future = executor.submit(self._download, video_opts, "video")
+            audio_future = executor.submit(self._download, audio_opts, "audio")
+            video_future.result()
+            audio_future.result()
         
-        with yt_dlp.YoutubeDL(audio_opts) as ydl:
-            try:
-                ydl.download([self.youtube_url])
-            except yt_dlp.utils.DownloadError as e:
-                self.task_logger.error(e)
-                raise RuntimeError(f"Failed to download audio {self.youtube_url}")
-            ydl.close()
-        
-        self.video_path = self.task_local_dir.joinpath(f"task_{self.task_id}.mp4")
-        self.audio_path = self.task_local_dir.joinpath(f"task_{self.task_id}.mp3")
+        self.video_path = self.mp4_path
+        self.audio_path = self.mp3_path
 
         self.task_logger.info(f" Video File Dir: {self.video_path}")
         self.task_logger.info(f" Audio File Dir: {self.audio_path}")
@@ -368,6 +499,15 @@ class YoutubeTask(Task):
 
         super().run_pipeline(pre_load_asr_model)
 
+    def _download(self, ydl_opts, media_type):
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            try:
+                # processing mutates the info dict, and the two downloads run in parallel
+                ydl.process_ie_result(copy.deepcopy(self.video_info), download=True)
+            except yt_dlp.utils.YoutubeDLError as e:
+                self.task_logger.error(e)
+                raise RuntimeError(f"Failed to download {media_type} {self.youtube_url}")
+
 class AudioTask(Task):
     def __init__(self, task_id, task_local_dir, task_cfg, audio_path):
         super().__init__(task_id, task_local_dir, task_cfg)
@@ -387,21 +527,37 @@ class VideoTask(Task):
         super().__init__(task_id, task_local_dir, task_cfg)
         # TODO: check video format {.mp4}
         self.task_logger.info("Task Creation method: Video File")
-        new_video_path = f"{task_local_dir}/task_{self.task_id}.mp4"
-        self.task_logger.info(f"Copy video file to: {new_video_path}")
-        shutil.copyfile(video_path, new_video_path)
-        self.video_path = new_video_path
+        self.task_logger.info(f"Copy video file to: {self.mp4_path}")
+        shutil.copyfile(video_path, self.mp4_path)
+        self.video_path = self.mp4_path
 
-    def run(self, pre_load_asr_model = None):
+    def prepare_audio(self):
+        """
+        Extracts the audio of the video for the ASR module.
+        """
         self.task_logger.info("using ffmpeg to extract audio")
-        subprocess.run(
-                ['ffmpeg', '-i', self.video_path, '-f', 'mp3',
-                 '-ab', '192000', '-vn', self.task_local_dir.joinpath(f"task_{self.task_id}.mp3")])
+        if self.ASR_setting["ASR_model"] != "whisper-api":
+            # local models take raw PCM, so decode from the video through a pipe instead of writing an audio file
+            self.audio_path = self.video_path
+            audio_input = load_audio_pcm(self.video_path)
+        else:
+            # demux the audio stream without re-encoding, fall back to mp3 encoding if the codec doesn't fit in .m4a
+            self.audio_path = self.m4a_path
+            extract = subprocess.run(
+                    ['ffmpeg', '-y', '-i', self.video_path, '-vn', '-c:a', 'copy', self.audio_path])
+            if extract.returncode != 0:
+                self.task_logger.info("audio stream copy failed, re-encoding to mp3")
+                self.audio_path = self.mp3_path
+                subprocess.run(
+                        ['ffmpeg', '-i', self.video_path, '-f', 'mp3',
+                         '-ab', '192000', '-vn', self.audio_path])
+            audio_input = self.audio_path
         self.task_logger.info("audio extraction finished")
+        self.task_logger.info(f" Audio File Dir: {self.audio_path}")
+        return audio_input
 
-        self.audio_path = self.task_local_dir.joinpath(f"task_{self.task_id}.mp3")
+    def run(self, pre_load_asr_model = None):
         self.task_logger.info(f" Video File Dir: {self.video_path}")
-        self.task_logger.info(f" Audio File Dir: {self.audio_path}")
         self.task_logger.info("Data Prep Complete. Start pipeline")
         super().run_pipeline(pre_load_asr_model)
 
@@ -411,15 +567,15 @@ class SRTTask(Task):
         self.task_logger.info("Task Creation method: SRT File")
         self.audio_path = None
         self.video_path = None
-        new_srt_path = f"{task_local_dir}/task_{self.task_id}_{self.source_lang}.srt"
-        self.task_logger.info(f"Copy video file to: {new_srt_path}")
-        shutil.copyfile(srt_path, new_srt_path)
         self.SRT_Script = SrtScript.parse_from_srt_file(self.source_lang, 
                                                         self.target_lang, 
                                                         self.task_logger, 
                                                         self.client, 
                                                         domain = self.field, 
                                                         path = srt_path)
+        # write the task's copy from the parsed script instead of copying and reading the file again
+        self.task_logger.info(f"Write srt file to: {self.src_srt_path}")
+        self.SRT_Script.write_srt_file_src(self.src_srt_path)
 
     def run(self):
         self.task_logger.info(f"Video File Dir: {self.video_path}")
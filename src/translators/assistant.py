@@ -1,21 +1,33 @@
-import time
+import re
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
 from .abs_api_model import AbsApiModel
 
 SUPPORT_DOMAIN = ["SC2"]
 ID_MAP = {"SC2": "asst_v1cEwYXexhfmkPEYtISyIjYI"} # should move to secrete place in the future
+TOOL_RESOURCES = {
+    "file_search": {
+        "vector_store_ids": ["vs_gtVvYnbEWLmmGNlANVmb4Lz3"]
+    }
+}
+# several inputs can be sent in one run, separated by this delimiter and prefixed with their index
+BATCH_DELIMITER = "\n###\n"
+BATCH_PROMPT = """
+            The input below contains {n} separate segments, separated by lines of "###". Each segment starts with
+            its index in square brackets, e.g. [0]. Translate each segment on its own and reply in the same format:
+            the same indices, in the same order, separated by lines of "###".
+            """
+_BATCH_SPLIT_RE = re.compile(r"\n\s*###\s*\n")
 
 class Assistant(AbsApiModel):   
     def __init__(self, client:OpenAI, system_prompt, temp = 0.15, domain = "SC2"):
         super().__init__()
         self.client = client
-        self.thread_id = self.client.beta.threads.create(tool_resources={
-            "file_search": {
-                "vector_store_ids": ["vs_gtVvYnbEWLmmGNlANVmb4Lz3"]
-            }
-        }).id
+        # async client with the same credentials, used by send_request_async
+        self.aclient = AsyncOpenAI(api_key=client.api_key, base_url=client.base_url)
+        # thread for the sync send_request path, created on first use
+        self.thread_id = None
         if domain not in SUPPORT_DOMAIN:
             raise NotImplementedError
         self.assistant_id = ID_MAP[domain]
@@ -28,21 +40,70 @@ class Assistant(AbsApiModel):
 
         :param input: Sentence for translation.
         """
+        return self._run(self.system_prompt + "\n" + input)
 
+    async def send_request_async(self, input):
+        """
+        Translates input sentence with desired LLM, without blocking the event loop.
+        A thread can only have one active run, so each call uses its own short-lived thread; this lets
+        several chunks be translated concurrently, but unlike send_request, earlier chunks are not
+        part of the conversation context.
+
+        :param input: Sentence for translation.
+        """
+        return await self._run_async(self.system_prompt + "\n" + input)
+
+    async def send_batch_async(self, inputs):
+        """
+        Translates several inputs in a single run, saving the per-run overhead for each extra input.
+        Falls back to one request per input if the reply can't be split back into len(inputs) parts.
+
+        :param inputs: List of sentences for translation.
+        :return: List of translations, in the same order as inputs.
+        """
+        if len(inputs) == 1:
+            return [await self.send_request_async(inputs[0])]
+        outputs = self._split_batch(await self._run_async(self._batch_content(inputs)), len(inputs))
+        if outputs is None:
+            return [await self.send_request_async(input) for input in inputs]
+        return outputs
+
+    def _batch_content(self, inputs):
+        batch = BATCH_DELIMITER.join(f"[{i}] {input}" for i, input in enumerate(inputs))
+        return self.system_prompt + "\n" + BATCH_PROMPT.format(n = len(inputs)) + "\n" + batch
+
+    @staticmethod
+    def _split_batch(response, n):
+        """
+        Splits a batched reply into its n parts, or returns None if it is malformed.
+        """
+        parts = _BATCH_SPLIT_RE.split(response.strip())
+        if len(parts) != n:
+            return None
+        outputs = []
+        for i, part in enumerate(parts):
+            prefix = f"[{i}]"
+            part = part.strip()
+            if not part.startswith(prefix):
+                return None
+            outputs.append(part[len(prefix):].strip())
+        return outputs
+
+    def _run(self, content):
+        if self.thread_id is None:
+            self.thread_id = self.client.beta.threads.create(tool_resources=TOOL_RESOURCES).id
         thread_message = self.client.beta.threads.messages.create(
             thread_id=self.thread_id,
             role="user",
-            content= self.system_prompt  + "/n" + input,
-            # file_ids=["file-ZWoegkS6ha4nrfie0iEchnVi", "file-bT6x3aqi4MsG9eKmIizFmzZE"]
+            content=content,
         )
 
+        # create_and_poll already waits for a terminal status, polling at the server-recommended interval
         run = self.client.beta.threads.runs.create_and_poll(
             thread_id=self.thread_id,
             assistant_id=self.assistant_id,
         )
 
-        run = self.wait_on_run(run)
-
         # retrieve all messages added after our last user message
 
         messages = self.client.beta.threads.messages.list(
@@ -51,13 +112,25 @@ class Assistant(AbsApiModel):
 
         return messages[0].content[0].text.value.strip()
 
-    def wait_on_run(self, run):
-        while run.status == "queued" or run.status == "in_progress":
-            run = self.client.beta.threads.runs.retrieve(
-                thread_id=self.thread_id,
-                run_id=run.id,
+    async def _run_async(self, content):
+        thread = await self.aclient.beta.threads.create(tool_resources=TOOL_RESOURCES)
+        try:
+            thread_message = await self.aclient.beta.threads.messages.create(
+                thread_id=thread.id,
+                role="user",
+                content=content,
             )
-            # print(run.status)
-            time.sleep(0.2)
-        return run
-    
\ No newline at end of file
+
+            await self.aclient.beta.threads.runs.create_and_poll(
+                thread_id=thread.id,
+                assistant_id=self.assistant_id,
+            )
+
+            messages = (await self.aclient.beta.threads.messages.list(
+                thread_id=thread.id, order="asc", after=thread_message.id
+            )).data
+
+            return messages[0].content[0].text.value.strip()
+        finally:
+            # the thread is only used for this request, don't leave it behind in the account
+            await self.aclient.beta.threads.delete(thread.id)
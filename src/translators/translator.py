@@ -1,9 +1,12 @@
+import asyncio
+import functools
 import logging
 import traceback
 from time import sleep
 from openai import OpenAI
 
 from tqdm import tqdm
+from tqdm.asyncio import tqdm as async_tqdm
 
 from src.srt_util.srt import split_script
 
@@ -11,6 +14,11 @@ from .assistant import Assistant
 from .LLM import LLM
 from .MTA import MTA
 
+# maximum number of requests in flight at the same time for translators with async support
+MAX_CONCURRENT_REQUESTS = 8
+# maximum source characters sent in one batched request
+MAX_BATCH_CHARS = 4000
+
 SUPPORT_LANG_MAP = {
     "EN": "English",
     "ZH": "Chinese",
@@ -23,6 +31,21 @@ SUPPORT_LANG_MAP = {
     "KR": "Korean",
 }
 
+@functools.lru_cache(maxsize=64)
+def prompt_selector(src_lang, tgt_lang, domain):
+    """
+    Builds the translation system prompt for a language pair and domain. Cached, since tasks with the same
+    settings share the same prompt. Unknown language abbreviations are used as given.
+    """
+    src_lang = SUPPORT_LANG_MAP.get(src_lang, src_lang)
+    tgt_lang = SUPPORT_LANG_MAP.get(tgt_lang, tgt_lang)
+    prompt = f"""
+            you are a translation assistant, your job is to translate a video in domain of {domain} from {src_lang} to {tgt_lang},
+            you will be provided with a segement in {src_lang} parsed by line, where your translation text should keep the original
+            meaning and the number of lines. DO NOT INCLUDE THE INDEX NUMBER IN YOUR TRANSLATION.  /n/n
+            """
+    return prompt
+
 class Translator:
     def __init__(self, model_name, src_lang, tgt_lang, domain, task_id, client, chunk_size = 1000):
         self.task_logger = logging.getLogger(f"task_{task_id}")
@@ -55,20 +78,12 @@ class Translator:
         self.task_logger.info("SRT file set")
 
     def prompt_selector(self):
-        try:
-            src_lang = SUPPORT_LANG_MAP[self.src_lang]
-            tgt_lang = SUPPORT_LANG_MAP[self.tgt_lang]
-            assert src_lang != tgt_lang
-        except:
+        if self.src_lang not in SUPPORT_LANG_MAP or self.tgt_lang not in SUPPORT_LANG_MAP or self.src_lang == self.tgt_lang:
             print("Unsupported language, is your abbreviation correct?")
             print(f"supported language map: {SUPPORT_LANG_MAP}")
-            self.task_logger.info(f"Unsupported language detected: {src_lang} to {tgt_lang}")
+            self.task_logger.info(f"Unsupported language detected: {self.src_lang} to {self.tgt_lang}")
 
-        prompt = f"""
-            you are a translation assistant, your job is to translate a video in domain of {self.domain} from {src_lang} to {tgt_lang},
-            you will be provided with a segement in {src_lang} parsed by line, where your translation text should keep the original
-            meaning and the number of lines. DO NOT INCLUDE THE INDEX NUMBER IN YOUR TRANSLATION.  /n/n
-            """
+        prompt = prompt_selector(self.src_lang, self.tgt_lang, self.domain)
         self.task_logger.info(f"System Prompt: {prompt}")
         return prompt
 
@@ -87,28 +102,94 @@ class Translator:
         if self.system_prompt is None:
             self.system_prompt = "你是一个翻译助理，你的任务是翻译视频，你会被提供一个按行分割的英文段落，你需要在保证句意和行数的情况下输出翻译后的文本。"
             self.task_logger.info(f"translation prompt: {self.system_prompt}")
-        previous_length = 0
+        if isinstance(self.translator, Assistant):
+            asyncio.run(self._translate_concurrently())
+        else:
+            asyncio.run(self._translate_sequentially())
+
+    async def _translate_sequentially(self):
+        """
+        Translates chunks one at a time in a worker thread. Each translated chunk is handed to its line fix-up
+        right away, so fix-ups run while the following chunks are still being translated.
+        """
+        fixup_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        fixups = []
         for sentence, range_ in tqdm(zip(self.script_arr, self.range_arr)):
-            # update the range based on previous length
-            range_ = (range_[0] + previous_length, range_[1] + previous_length)
-
-            print(f"now translating sentences {range_}")
-            self.task_logger.info(f"now translating sentences {range_}")
-            flag = True
-            while flag:
-                flag = False
-                try:
-                    translation = self.translator.send_request(sentence)
-                except Exception as e:
-                    print("An error has occurred during translation:", e)
-                    print(traceback.format_exc())
-                    self.task_logger.debug("An error has occurred during translation:", e)
-                    self.task_logger.info("Retrying... the script will continue after 30 seconds.")
-                    sleep(30)
-                    flag = True
+            translation = await asyncio.to_thread(self._send_request, sentence, range_)
+            fixups.append(asyncio.create_task(self._set_translation_async(translation, range_, fixup_semaphore)))
+        await asyncio.gather(*fixups)
 
+    async def _translate_concurrently(self):
+        """
+        Translates all chunks concurrently (at most MAX_CONCURRENT_REQUESTS requests at a time). Consecutive chunks
+        are batched into one request up to MAX_BATCH_CHARS. Each chunk's line fix-up starts as soon as its batch is done.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        fixup_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        await async_tqdm.gather(*[self._translate_batch_async(batch, semaphore, fixup_semaphore)
+                                  for batch in self._batch_chunks()])
+
+    def _batch_chunks(self):
+        """
+        Groups consecutive (sentence, range) chunks so that each group has at most MAX_BATCH_CHARS of source text.
+        """
+        batches = []
+        batch_len = 0
+        for sentence, range_ in zip(self.script_arr, self.range_arr):
+            if batches and batch_len + len(sentence) <= MAX_BATCH_CHARS:
+                batches[-1].append((sentence, range_))
+                batch_len += len(sentence)
+            else:
+                batches.append([(sentence, range_)])
+                batch_len = len(sentence)
+        return batches
+
+    async def _translate_batch_async(self, batch, semaphore, fixup_semaphore):
+        async with semaphore:
+            translations = await self._send_batch_async(batch)
+        # chunks cover disjoint ranges, so their line fix-ups can run concurrently
+        await asyncio.gather(*[self._set_translation_async(translation, range_, fixup_semaphore)
+                               for translation, (_, range_) in zip(translations, batch)])
+
+    async def _set_translation_async(self, translation, range_, fixup_semaphore):
+        # fix-ups may call the LLM to merge/split lines, so they share a limit on requests in flight too
+        async with fixup_semaphore:
+            await self.srt.set_translation(translation, range_, self.model_name, self.task_id)
+
+    def _send_request(self, sentence, range_):
+        print(f"now translating sentences {range_}")
+        self.task_logger.info(f"now translating sentences {range_}")
+        while True:
+            try:
+                translation = self.translator.send_request(sentence)
+                break
+            except Exception as e:
+                print("An error has occurred during translation:", e)
+                print(traceback.format_exc())
+                self.task_logger.debug("An error has occurred during translation:", e)
+                self.task_logger.info("Retrying... the script will continue after 30 seconds.")
+                sleep(30)
+
+        self.task_logger.info(f"source text: {sentence}")
+        self.task_logger.info(f"translate text: {translation}")
+        return translation
+
+    async def _send_batch_async(self, batch):
+        ranges = [range_ for _, range_ in batch]
+        print(f"now translating sentences {ranges}")
+        self.task_logger.info(f"now translating sentences {ranges}")
+        while True:
+            try:
+                translations = await self.translator.send_batch_async([sentence for sentence, _ in batch])
+                break
+            except Exception as e:
+                print("An error has occurred during translation:", e)
+                print(traceback.format_exc())
+                self.task_logger.debug("An error has occurred during translation:", e)
+                self.task_logger.info("Retrying... the script will continue after 30 seconds.")
+                await asyncio.sleep(30)
+
+        for (sentence, _), translation in zip(batch, translations):
             self.task_logger.info(f"source text: {sentence}")
             self.task_logger.info(f"translate text: {translation}")
-            self.srt.set_translation(translation, range_, self.model_name, self.task_id)
-
-        
+        return translations
@@ -33,7 +33,7 @@ def get_task_status(taskId):
     global task_map
     if taskId not in task_map:
         return jsonify({'error': 'Task not found'}), 404
-    return jsonify({'status': task_map[taskId].status})
+    return jsonify({'status': task_map[taskId].status.name})
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,56 @@
+import __init_path__
+
+import asyncio
+import unittest
+
+from src.translators.assistant import Assistant, BATCH_DELIMITER
+
+class FakeAssistant(Assistant):
+    """
+    Assistant with the API calls replaced by a canned batched reply; single requests echo their input.
+    """
+    def __init__(self, batch_reply):
+        self.system_prompt = "prompt"
+        self.batch_reply = batch_reply
+        self.requests = []
+
+    async def _run_async(self, content):
+        return self.batch_reply
+
+    async def send_request_async(self, input):
+        self.requests.append(input)
+        return f"single {input}"
+
+class TestAssistantBatch(unittest.TestCase):
+
+    def test_split_well_formed(self):
+        reply = "[0] 第一段\n第二行\n###\n[1] 第二段\n ### \n[2]第三段"
+        self.assertEqual(Assistant._split_batch(reply, 3), ["第一段\n第二行", "第二段", "第三段"])
+
+    def test_split_wrong_part_count(self):
+        self.assertIsNone(Assistant._split_batch("[0] a\n###\n[1] b", 3))
+        self.assertIsNone(Assistant._split_batch("[0] a\n###\n[1] b\n###\n[2] c", 2))
+
+    def test_split_missing_prefix(self):
+        self.assertIsNone(Assistant._split_batch("[0] a\n###\nb\n###\n[2] c", 3))
+
+    def test_split_out_of_order(self):
+        self.assertIsNone(Assistant._split_batch("[1] b\n###\n[0] a", 2))
+
+    def test_batch_content(self):
+        content = FakeAssistant("")._batch_content(["a", "b"])
+        self.assertTrue(content.startswith("prompt\n"))
+        self.assertTrue(content.endswith("\n[0] a" + BATCH_DELIMITER + "[1] b"))
+
+    def test_send_batch(self):
+        assistant = FakeAssistant("[0] A\n###\n[1] B")
+        self.assertEqual(asyncio.run(assistant.send_batch_async(["a", "b"])), ["A", "B"])
+        self.assertEqual(assistant.requests, [])
+
+    def test_send_batch_fallback(self):
+        assistant = FakeAssistant("[0] A B")
+        self.assertEqual(asyncio.run(assistant.send_batch_async(["a", "b"])), ["single a", "single b"])
+        self.assertEqual(assistant.requests, ["a", "b"])
+
+if __name__ == '__main__':
+    unittest.main()
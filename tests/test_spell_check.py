@@ -0,0 +1,51 @@
+import __init_path__
+
+import logging
+import unittest
+from unittest import mock
+
+import src.srt_util.srt as srt_module
+from src.srt_util.srt import SrtScript
+
+class StubDict:
+    """
+    Stands in for enchant.Dict: knows a few english words and, like enchant, rejects empty strings.
+    """
+    words = {"well", "the", "attack", "send", "to"}
+
+    def check(self, word):
+        if not word:
+            raise ValueError("can't check spelling of empty string")
+        return word in self.words
+
+class TestSpellCheck(unittest.TestCase):
+
+    def form_srt_class(self, source_text):
+        srt = SrtScript("EN", "ZH", [[0, "00:00:00,000 --> 00:00:02,220", source_text]],
+                        logging.getLogger("test_spell_check"), None)
+        srt.domain = "SC2"
+        srt.dict = {"zerg": ["虫族"], "hydralisk": ["刺蛇"]}
+        return srt
+
+    def spell_check(self, srt):
+        with mock.patch.object(srt_module, "enchant", object()), \
+             mock.patch.object(srt_module, "_get_en_dict", StubDict):
+            srt.spell_check_term()
+
+    def test_extract_words_skips_punctuation_only_chunks(self):
+        srt = self.form_srt_class("")
+        chunks = list(srt.extract_words("well ... the zerg?!", 1))
+        self.assertEqual(chunks, [("well", "well", 4), ("the", "the", 3), ("zerg?!", "zerg", 4)])
+
+    def test_punctuation_only_tokens(self):
+        srt = self.form_srt_class("well ... the zerg attack ?! ,")
+        self.spell_check(srt)
+        self.assertEqual(srt.segments[0].source_text, "well ... the zerg attack ?! ,")
+
+    def test_correct_misspelled_term(self):
+        srt = self.form_srt_class("send the hydralisc ... to attack")
+        self.spell_check(srt)
+        self.assertEqual(srt.segments[0].source_text, "send the hydralisk ... to attack")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import __init_path__
+
+import logging
+import unittest
+
+from src.srt_util.srt import SrtScript
+
+class TestSrtParse(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger("test_srt_parse")
+
+    def parse(self, srt_str):
+        return SrtScript.parse_from_srt_file("EN", "ZH", self.logger, None, domain="General", srt_str=srt_str)
+
+    def test_source_only(self):
+        srt = self.parse("1\n00:00:00,000 --> 00:00:01,500\nhello\n\n2\n00:00:01,500 --> 00:00:03,000\nworld\n\n")
+        self.assertEqual([seg.source_text for seg in srt.segments], ["hello", "world"])
+        self.assertEqual([seg.translation for seg in srt.segments], ["", ""])
+        self.assertEqual(srt.segments[1].duration, "00:00:01,500 --> 00:00:03,000")
+
+    def test_stray_blank_lines(self):
+        srt = self.parse("\n\n1\n00:00:00,000 --> 00:00:01,500\nhello\n\n\n\n2\n00:00:01,500 --> 00:00:03,000\nworld\n\n\n")
+        self.assertEqual([seg.source_text for seg in srt.segments], ["hello", "world"])
+
+    def test_bilingual_detected_from_first_block(self):
+        srt = self.parse("1\n00:00:00,000 --> 00:00:01,500\nhello\n你好\n\n2\n00:00:01,500 --> 00:00:03,000\nworld\n世界\n\n")
+        self.assertEqual([seg.source_text for seg in srt.segments], ["hello", "world"])
+        self.assertEqual([seg.translation for seg in srt.segments], ["你好", "世界"])
+
+    def test_multiline_caption_kept_if_first_block_is_source_only(self):
+        blocks = list(SrtScript._iter_srt_segments(
+            ["1", "00:00:00,000 --> 00:00:01,500", "hello", "",
+             "2", "00:00:01,500 --> 00:00:03,000", "hello", "world", ""]))
+        self.assertEqual(blocks, [["1", "00:00:00,000 --> 00:00:01,500", "hello"],
+                                  ["2", "00:00:01,500 --> 00:00:03,000", "hello\nworld"]])
+
+    def test_last_block_without_trailing_blank_line(self):
+        srt = self.parse("1\n00:00:00,000 --> 00:00:01,500\nhello\n\n2\n00:00:01,500 --> 00:00:03,000\nworld")
+        self.assertEqual(len(srt.segments), 2)
+        self.assertEqual(srt.segments[1].source_text, "world")
+
+    def test_crlf(self):
+        srt = self.parse("1\r\n00:00:00,000 --> 00:00:01,500\r\nhello\r\n你好\r\n\r\n2\r\n00:00:01,500 --> 00:00:03,000\r\nworld\r\n世界\r\n")
+        self.assertEqual([seg.source_text for seg in srt.segments], ["hello", "world"])
+        self.assertEqual([seg.translation for seg in srt.segments], ["你好", "世界"])
+        self.assertEqual(srt.segments[1].end_time_str, "00:00:03,000")
+
+if __name__ == '__main__':
+    unittest.main()
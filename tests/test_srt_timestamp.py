@@ -0,0 +1,60 @@
+import __init_path__
+
+import logging
+import unittest
+
+from src.srt_util.srt import SrtScript, _srt_timestamp, _parse_srt_timestamp
+
+class TestSrtTimestamp(unittest.TestCase):
+
+    def form_srt_class(self, start, end):
+        segments = [{"start": start, "end": end, "text": " hello"}]
+        return SrtScript("EN", "ZH", segments, logging.getLogger("test_srt_timestamp"), None)
+
+    def test_format(self):
+        self.assertEqual(_srt_timestamp(0), "00:00:00,000")
+        self.assertEqual(_srt_timestamp(3723004), "01:02:03,004")
+        self.assertEqual(_srt_timestamp(59999), "00:00:59,999")
+
+    def test_format_hours_over_ten(self):
+        self.assertEqual(_srt_timestamp(36000000), "10:00:00,000")
+        self.assertEqual(_srt_timestamp(45296789), "12:34:56,789")
+
+    def test_segment_ms_rounding(self):
+        # 1.001 * 1000 is 1000.999..., must round to 1001 rather than truncate
+        seg = self.form_srt_class(1.001, 2.0006).segments[0]
+        self.assertEqual(seg.start_time_str, "00:00:01,001")
+        self.assertEqual(seg.end_time_str, "00:00:02,001")
+        self.assertEqual((seg.start_ms, seg.end_ms), (1, 1))
+
+    def test_segment_ms_rounding_carry(self):
+        seg = self.form_srt_class(59.9996, 3599.9999).segments[0]
+        self.assertEqual(seg.start_time_str, "00:01:00,000")
+        self.assertEqual(seg.end_time_str, "01:00:00,000")
+
+    def test_segment_empty_duration(self):
+        seg = self.form_srt_class(5.0, 5.0).segments[0]
+        self.assertEqual(seg.duration, "00:00:05,000 --> 00:00:05,500")
+
+    def test_parse(self):
+        self.assertEqual(_parse_srt_timestamp("00:00:00,000"), (0, 0))
+        self.assertEqual(_parse_srt_timestamp("01:02:03,004"), (3723.004, 4))
+
+    def test_parse_hours_over_ten(self):
+        self.assertEqual(_parse_srt_timestamp("12:34:56,789"), (45296.789, 789))
+
+    def test_parse_round_trip(self):
+        for total_ms in (0, 999, 1001, 59999, 3723004, 45296789):
+            seconds, ms = _parse_srt_timestamp(_srt_timestamp(total_ms))
+            self.assertEqual(round(seconds * 1000), total_ms)
+            self.assertEqual(ms, total_ms % 1000)
+
+    def test_segment_from_srt_block(self):
+        segments = [[1, "10:00:01,250 --> 10:00:02,005", "hello"]]
+        seg = SrtScript("EN", "ZH", segments, logging.getLogger("test_srt_timestamp"), None).segments[0]
+        self.assertEqual((seg.start, seg.start_ms), (36001.25, 250))
+        self.assertEqual((seg.end, seg.end_ms), (36002.005, 5))
+        self.assertEqual(seg.start_time_str, "10:00:01,250")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import __init_path__
+
+import logging
+import random
+import unittest
+from unittest import mock
+
+import src.srt_util.srt as srt_module
+from src.srt_util.srt import SrtScript
+
+TERMS = ["hydra", "hydralisk", "zerg", "forge", "engineering bay", "engin bay", "bay", "ab", "abc", "b c"]
+
+class TestTermReplace(unittest.TestCase):
+
+    def setUp(self):
+        self.srt = SrtScript("EN", "ZH", [], logging.getLogger("test_term_replace"), None)
+        self.srt.dict = {term: [term.upper()] for term in TERMS}
+        self.srt._build_term_index()
+        self.replace = lambda term: f"<{term}>"
+
+    def regex_replace(self, text):
+        self.assertIsNone(self.srt._term_automaton)
+        return self.srt._replace_terms(text, self.replace)
+
+    def automaton_replace(self, text):
+        if self.srt._term_automaton is None:
+            with mock.patch.object(srt_module, "_AHOCORASICK_MIN_TERMS", 0):
+                self.srt._build_term_index()
+        return self.srt._replace_terms(text, self.replace)
+
+    def test_regex_path(self):
+        self.assertEqual(self.regex_replace("Hydras and a hydralisk near the Forges"),
+                         "<hydra> and a <hydralisk> near the <forge>")
+        self.assertEqual(self.regex_replace("the zerges build an engin bay, not an engineering bay"),
+                         "the <zerg> build an <engin bay>, not an <engineering bay>")
+        # no replacement inside words or with other suffixes
+        self.assertEqual(self.regex_replace("hydrant zergling forged abcd"), "hydrant zergling forged abcd")
+
+    @unittest.skipIf(srt_module.ahocorasick is None, "pyahocorasick is not installed")
+    def test_automaton_matches_regex(self):
+        cases = [
+            "Hydras and a hydralisk near the Forges",
+            "the zerges build an engin bay, not an engineering bay",
+            "hydrant zergling forged abcd",
+            "abc ab abs abes abcs ab_c b c b cs",
+            "HYDRALISKS,hydra-zerg;forge.",
+            "",
+        ]
+        random.seed(0)
+        tokens = TERMS + ["es", "s", "x", "_", "Ab", "Hydra", "ZERG"]
+        for _ in range(2000):
+            words = [random.choice(tokens) + random.choice(["", "s", "es", "_", "1"]) for _ in range(random.randint(0, 8))]
+            cases.append(''.join(word + random.choice([" ", "", ",", "-"]) for word in words))
+
+        expected = [self.regex_replace(text) for text in cases]
+        for text, regex_result in zip(cases, expected):
+            self.assertEqual(self.automaton_replace(text), regex_result, text)
+        self.assertIsNotNone(self.srt._term_automaton)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import __init_path__
+
+import logging
+import unittest
+
+from src.task import YoutubeTask
+
+class TestYoutubeDownload(unittest.TestCase):
+
+    def setUp(self):
+        # skip Task.__init__, which fetches the video info over the network
+        self.task = YoutubeTask.__new__(YoutubeTask)
+        self.task.task_logger = logging.getLogger("test_youtube_download")
+        self.task.youtube_url = "https://www.youtube.com/watch?v=test"
+        self.task.video_info = {
+            "id": "test",
+            "title": "test",
+            "extractor": "youtube",
+            "extractor_key": "Youtube",
+            "webpage_url": self.task.youtube_url,
+            "formats": [{"format_id": "18", "url": "http://127.0.0.1/test.mp4", "ext": "mp4",
+                         "vcodec": "avc1", "acodec": "mp4a", "height": 360}],
+        }
+
+    def test_unavailable_format(self):
+        # youtube never serves mp3 audio, so the format can't be matched
+        opts = {"format": "bestaudio[ext=mp3]", "outtmpl": "test.mp3", "quiet": True}
+        with self.assertRaises(RuntimeError):
+            self.task._download(opts, "audio")
+
+if __name__ == '__main__':
+    unittest.main()